@@ -5,7 +5,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine.url import URL
 
-from auth.utils import create_all_tables, drop_all_tables
+from auth.utils import add_missing_columns, create_all_tables, drop_all_tables
 from chatbot.models import User
 from chatbot.models import Chat, Message
 
@@ -30,7 +30,13 @@ Base = declarative_base()
 
 all_models = [User, Chat, Message, Base]
 
+# create_all only creates missing tables, so columns added later are upgraded here
+new_columns = {
+    "messages": {"sql_query": "TEXT", "database_path": "VARCHAR(255)"},
+}
+
 if os.getenv("DROP_ALL_TABLES", False) == "True":
     drop_all_tables(all_models, engine)
 
 create_all_tables(all_models, engine)
+add_missing_columns(engine, new_columns)
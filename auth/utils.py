@@ -1,6 +1,7 @@
 import secrets
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from sqlalchemy import inspect, text
 from datetime import datetime, timedelta
 
 SECRET_KEY = secrets.token_hex(32)
@@ -39,3 +40,18 @@ def create_all_tables(all_models, engine):
     for model in all_models:
         print(f"Creating table {model}")
         model.metadata.create_all(bind=engine)
+
+
+def add_missing_columns(engine, new_columns):
+    """Add columns introduced after a table was first created, skipping the ones that already exist."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, columns in new_columns.items():
+            if not inspector.has_table(table_name):
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table_name)}
+            for column_name, column_type in columns.items():
+                if column_name not in existing_columns:
+                    print(f"Adding column {column_name} to table {table_name}")
+                    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
@@ -1,13 +1,22 @@
+import base64
+import csv
+import io
+import json
 import re
 import sqlite3
 from pathlib import Path
+from urllib.request import pathname2url
 
 import pandas as pd
+import pyarrow as pa
 from langchain.chains.sql_database.prompt import SQL_PROMPTS
 from langchain_community.agent_toolkits import create_sql_agent
 from langchain_community.utilities import SQLDatabase
 from langchain_groq import ChatGroq
 
+# The SQL agent is told to LIMIT queries to this many rows unless the user asks for a number
+SQL_AGENT_TOP_K = 10
+
 
 def get_db_info(db_path):
     db_info = ""
@@ -42,7 +51,13 @@ def natural_language_to_sql(question, llm, db_name):
     db = SQLDatabase.from_uri(f"sqlite:///{db_name}")
     db_info = get_db_info(f"{db_name}")
 
-    agent_executor = create_sql_agent(llm, db=db, verbose=True)
+    agent_executor = create_sql_agent(
+        llm,
+        db=db,
+        top_k=SQL_AGENT_TOP_K,
+        verbose=True,
+        agent_executor_kwargs={"return_intermediate_steps": True},
+    )
     agent_executor.handle_parsing_errors = True
     response = agent_executor.invoke(
         {
@@ -65,7 +80,7 @@ def natural_language_to_sql(question, llm, db_name):
                      """
         }
     )
-    return response['output']
+    return response['output'], extract_sql_query(response.get('intermediate_steps', []))
 
 
 def sanitize_table_name(name: str) -> str:
@@ -120,3 +135,173 @@ def merge_db_files(conn: sqlite3.Connection, db_file: str):
     source_conn.close()
     print(f"Finished merging {db_file} into destination database.")
 
+
+def extract_sql_query(intermediate_steps):
+    """Return the last query the agent ran successfully with the sql_db_query tool."""
+    sql_query = None
+    for action, observation in intermediate_steps:
+        if action.tool != "sql_db_query":
+            continue
+        if isinstance(observation, str) and observation.startswith("Error"):
+            continue
+
+        tool_input = action.tool_input
+        if isinstance(tool_input, dict):
+            tool_input = tool_input.get("query")
+        if tool_input:
+            sql_query = tool_input.strip()
+
+    return sql_query
+
+
+def strip_agent_limit(sql_query: str, top_k: int = SQL_AGENT_TOP_K) -> str:
+    """Remove the outer LIMIT the SQL agent adds by default, so exports return every row.
+
+    Only a trailing `LIMIT <top_k>` is removed; any other LIMIT is assumed to come from
+    the question itself and is kept. A question asking for exactly top_k rows therefore
+    exports the unlimited result.
+    """
+    return re.sub(rf"\s+LIMIT\s+{top_k}\s*;?\s*$", "", sql_query.strip(), flags=re.IGNORECASE)
+
+
+def open_read_only_cursor(db_path: str, sql_query: str) -> sqlite3.Cursor:
+    """Execute a query on a read-only connection and return the open cursor."""
+    # The cursor is read later by the streaming response, which may resume it on another
+    # threadpool worker; access is still sequential, so the same-thread check can be relaxed
+    db_uri = f"file:{pathname2url(str(Path(db_path).resolve()))}?mode=ro"
+    conn = sqlite3.connect(db_uri, uri=True, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA query_only = ON;")
+        cursor = conn.cursor()
+        cursor.execute(sql_query)
+    except sqlite3.Error:
+        conn.close()
+        raise
+
+    if cursor.description is None:
+        conn.close()
+        raise sqlite3.OperationalError("Query does not return any rows")
+
+    return cursor
+
+
+def parse_export_batch_size(value: str) -> int:
+    """Parse the EXPORT_BATCH_SIZE setting, rejecting values fetchmany cannot stream with."""
+    try:
+        batch_size = int(value)
+    except ValueError:
+        raise ValueError(f"EXPORT_BATCH_SIZE must be an integer, got {value!r}")
+
+    if batch_size < 1:
+        raise ValueError(f"EXPORT_BATCH_SIZE must be at least 1, got {batch_size}")
+
+    return batch_size
+
+
+def iter_cursor_batches(cursor: sqlite3.Cursor, batch_size: int):
+    """Yield rows from the cursor in fetchmany batches, closing the connection at the end."""
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.connection.close()
+
+
+def export_value(value):
+    """Encode BLOB values as base64 text so every export format represents them the same way."""
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def stream_csv(cursor: sqlite3.Cursor, batch_size: int = 1000):
+    """Stream the cursor result as CSV, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([description[0] for description in cursor.description])
+
+    for rows in iter_cursor_batches(cursor, batch_size):
+        writer.writerows([export_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(cursor: sqlite3.Cursor, batch_size: int = 1000):
+    """Stream the cursor result as newline delimited JSON, one chunk per batch."""
+    column_names = [description[0] for description in cursor.description]
+
+    for rows in iter_cursor_batches(cursor, batch_size):
+        yield "".join(
+            json.dumps({name: export_value(value) for name, value in zip(column_names, row)}) + "\n"
+            for row in rows
+        )
+
+
+def read_column_storage_classes(cursor: sqlite3.Cursor, sql_query: str):
+    """Collect the SQLite storage classes each result column holds across the whole result."""
+    column_aliases = [f"column_{index}" for index in range(len(cursor.description))]
+    type_query = (
+        f"WITH export_result({', '.join(column_aliases)}) AS ({sql_query.strip().rstrip(';')}) "
+        f"SELECT {', '.join(f'group_concat(DISTINCT typeof({alias}))' for alias in column_aliases)} "
+        f"FROM export_result;"
+    )
+    try:
+        storage_classes = cursor.connection.execute(type_query).fetchone()
+    except sqlite3.Error:
+        cursor.connection.close()
+        raise
+
+    return [set(classes.split(",")) - {"null"} if classes else set() for classes in storage_classes]
+
+
+def arrow_type_for_storage_classes(storage_classes) -> pa.DataType:
+    """Pick an Arrow type that can hold every value of a column without loss of data."""
+    if storage_classes == {"integer"}:
+        return pa.int64()
+    if storage_classes and storage_classes <= {"integer", "real"}:
+        return pa.float64()
+    if storage_classes == {"blob"}:
+        return pa.binary()
+    # Empty and mixed-type columns are exported as text, with BLOBs base64 encoded
+    return pa.string()
+
+
+def to_arrow_array(column, arrow_type: pa.DataType) -> pa.Array:
+    """Convert a column to the given Arrow type."""
+    if arrow_type == pa.string():
+        column = [str(export_value(value)) if value is not None else None for value in column]
+
+    return pa.array(column, type=arrow_type)
+
+
+def stream_arrow(cursor: sqlite3.Cursor, storage_classes, batch_size: int = 1000):
+    """Stream the cursor result in the Arrow IPC streaming format, one record batch per fetch.
+
+    SQLite has no static column types, so the schema comes from the storage classes found in
+    the whole result (see read_column_storage_classes) rather than from the first batch.
+    """
+    column_names = [description[0] for description in cursor.description]
+    schema = pa.schema([
+        pa.field(name, arrow_type_for_storage_classes(classes))
+        for name, classes in zip(column_names, storage_classes)
+    ])
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    for rows in iter_cursor_batches(cursor, batch_size):
+        columns = list(zip(*rows))
+        arrays = [to_arrow_array(column, field.type) for column, field in zip(columns, schema)]
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate(0)
+
+    writer.close()
+    yield sink.getvalue()
@@ -37,6 +37,8 @@ class Message(Base):
     chat_id = Column(Integer, ForeignKey("chats.id", ondelete="CASCADE"))
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     message = Column(Text, nullable=False)
+    sql_query = Column(Text, nullable=True)
+    database_path = Column(String(255), nullable=True)
 
     # A message belongs to one chat and one user
     chat = relationship("Chat", back_populates="messages")
@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import List
 
 from fastapi import APIRouter, Depends, File, HTTPException, status, UploadFile
+from fastapi.responses import StreamingResponse
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
 from sqlalchemy.orm import Session
@@ -11,11 +12,19 @@ from auth.dependencies import get_current_user
 from chatbot.helpers import (
     merge_db_files,
     natural_language_to_sql,
+    open_read_only_cursor,
+    parse_export_batch_size,
     process_csv_to_db,
+    read_column_storage_classes,
+    stream_arrow,
+    stream_csv,
+    stream_ndjson,
+    strip_agent_limit,
 )
 from chatbot.schemas import UserSchema
 from chatbot.models import User
 from chatbot.schemas import (
+    ExportFormatEnum,
     LLMModelEnum,
     MessageCreate,
     ChatCreate,
@@ -27,6 +36,14 @@ from auth.dependencies import get_db
 
 router = APIRouter()
 
+EXPORT_BATCH_SIZE = parse_export_batch_size(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_STREAMERS = {
+    ExportFormatEnum.csv: (stream_csv, "text/csv", "csv"),
+    ExportFormatEnum.ndjson: (stream_ndjson, "application/x-ndjson", "ndjson"),
+    ExportFormatEnum.arrow: (stream_arrow, "application/vnd.apache.arrow.stream", "arrows"),
+}
+
 
 def create_default_bot(db: Session) -> User:
     bot_user = db.query(User).filter(User.username == "nino").first()
@@ -80,9 +97,15 @@ def generate_bot_answer(
     if message.model_name == LLMModelEnum.chatgpt:
         llm = ChatOpenAI(model="gpt-4o")
 
+    answer_text, sql_query = natural_language_to_sql(
+        question=message.message, llm=llm, db_name=current_user.user_database_path
+    )
+
     answer = Message(
             chat_id=message.chat_id,
-            message=natural_language_to_sql(question=message.message, llm=llm, db_name=current_user.user_database_path),
+            message=answer_text,
+            sql_query=sql_query,
+            database_path=current_user.user_database_path,
             user_id=bot_user.id
     )
 
@@ -93,6 +116,62 @@ def generate_bot_answer(
     return answer
 
 
+@router.get("/export_message_result/{message_id}")
+def export_message_result(
+    message_id: int,
+    export_format: ExportFormatEnum = ExportFormatEnum.csv,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    answer = (
+        db.query(Message)
+        .join(Chat, Message.chat_id == Chat.id)
+        .filter(Message.id == message_id, Chat.user_id == current_user.id)
+        .first()
+    )
+    if not answer:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
+    if not answer.sql_query:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message has no SQL query to export")
+    if not current_user.user_database_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User has no database to export from")
+
+    # The query only makes sense against the database the answer was generated from
+    if answer.database_path != current_user.user_database_path:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The database this answer was generated from has been replaced",
+        )
+    if not os.path.exists(answer.database_path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="The database this answer was generated from no longer exists",
+        )
+
+    # The agent caps its queries at SQL_AGENT_TOP_K rows, the export returns all of them
+    export_query = strip_agent_limit(answer.sql_query)
+
+    # Run the query before streaming so SQL errors still become a proper HTTP response
+    try:
+        cursor = open_read_only_cursor(answer.database_path, export_query)
+        if export_format == ExportFormatEnum.arrow:
+            storage_classes = read_column_storage_classes(cursor, export_query)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Could not execute query: {e}")
+
+    streamer, media_type, extension = EXPORT_STREAMERS[export_format]
+    if export_format == ExportFormatEnum.arrow:
+        stream = streamer(cursor, storage_classes, batch_size=EXPORT_BATCH_SIZE)
+    else:
+        stream = streamer(cursor, batch_size=EXPORT_BATCH_SIZE)
+
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="message_{message_id}.{extension}"'},
+    )
+
+
 @router.get("/list_chat_histories/", response_model=List[ChatSchema])
 def list_chat_histories(
     current_user: User = Depends(get_current_user),
@@ -16,10 +16,17 @@ class LLMModelEnum(str, enum.Enum):
     groq = "groq"
 
 
+class ExportFormatEnum(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    arrow = "arrow"
+
+
 class MessageSchema(BaseModel):
     id: int
     message: str
     user_id: int
+    sql_query: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -0,0 +1,28 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+# auth.database builds its engine from the environment at import time
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DRIVER_NAME", "sqlite")
+os.environ.setdefault("DB_NAME", os.path.join(tempfile.mkdtemp(), "chatbot_test.db"))
+
+EXPORT_ROWS = 25
+
+
+@pytest.fixture
+def export_db(tmp_path):
+    """A small user database with more rows than the batch sizes used in the tests."""
+    db_path = tmp_path / "export.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE medals (id INTEGER, country TEXT, score REAL);")
+    conn.executemany(
+        "INSERT INTO medals (id, country, score) VALUES (?, ?, ?);",
+        [(i, f"country_{i}", i / 2) for i in range(EXPORT_ROWS)],
+    )
+    conn.commit()
+    conn.close()
+    return str(db_path)
@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pytest
+from langchain_core.agents import AgentAction
+
+from chatbot import helpers
+from chatbot.helpers import (
+    extract_sql_query,
+    natural_language_to_sql,
+    open_read_only_cursor,
+    parse_export_batch_size,
+    read_column_storage_classes,
+    stream_arrow,
+    stream_csv,
+    stream_ndjson,
+    strip_agent_limit,
+)
+from tests.conftest import EXPORT_ROWS
+
+EXPORT_QUERY = "SELECT id, country, score FROM medals ORDER BY id;"
+EXPECTED_ROWS = [(i, f"country_{i}", i / 2) for i in range(EXPORT_ROWS)]
+
+
+def export_arrow(db_path, sql_query, batch_size=1000):
+    cursor = open_read_only_cursor(db_path, sql_query)
+    storage_classes = read_column_storage_classes(cursor, sql_query)
+    return pa.ipc.open_stream(b"".join(stream_arrow(cursor, storage_classes, batch_size=batch_size)))
+
+
+def test_stream_csv_exports_every_batch(export_db):
+    cursor = open_read_only_cursor(export_db, EXPORT_QUERY)
+    chunks = list(stream_csv(cursor, batch_size=4))
+
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert len(chunks) == 7
+    assert rows[0] == ["id", "country", "score"]
+    assert rows[1:] == [[str(value) for value in row] for row in EXPECTED_ROWS]
+
+
+def test_stream_ndjson_exports_every_batch(export_db):
+    cursor = open_read_only_cursor(export_db, EXPORT_QUERY)
+    chunks = list(stream_ndjson(cursor, batch_size=4))
+
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(chunks) == 7
+    assert records == [dict(zip(["id", "country", "score"], row)) for row in EXPECTED_ROWS]
+
+
+def test_stream_arrow_exports_every_batch(export_db):
+    reader = export_arrow(export_db, EXPORT_QUERY, batch_size=4)
+    batches = list(reader)
+
+    assert len(batches) == 7
+    assert reader.schema == pa.schema([("id", pa.int64()), ("country", pa.string()), ("score", pa.float64())])
+    table = pa.Table.from_batches(batches)
+    assert list(zip(*table.to_pydict().values())) == EXPECTED_ROWS
+
+
+def test_stream_arrow_empty_result(export_db):
+    table = export_arrow(export_db, "SELECT id, country FROM medals WHERE id < 0;").read_all()
+
+    assert table.num_rows == 0
+    assert table.column_names == ["id", "country"]
+
+
+def test_open_read_only_cursor_rejects_writes(export_db):
+    with pytest.raises(sqlite3.OperationalError):
+        open_read_only_cursor(export_db, "DELETE FROM medals;")
+
+
+def test_extract_sql_query_keeps_last_successful_query():
+    intermediate_steps = [
+        (AgentAction(tool="sql_db_list_tables", tool_input="", log=""), "medals"),
+        (AgentAction(tool="sql_db_query", tool_input="SELECT 1;", log=""), "[(1,)]"),
+        (AgentAction(tool="sql_db_query", tool_input={"query": " SELECT 2; "}, log=""), "[(2,)]"),
+        (AgentAction(tool="sql_db_query", tool_input="SELEC 3;", log=""), "Error: syntax error"),
+    ]
+
+    assert extract_sql_query(intermediate_steps) == "SELECT 2;"
+    assert extract_sql_query([]) is None
+
+
+def test_natural_language_to_sql_returns_answer_and_query(export_db, monkeypatch):
+    class FakeAgentExecutor:
+        def invoke(self, inputs):
+            return {
+                "output": "There are 25 medals.",
+                "intermediate_steps": [
+                    (AgentAction(tool="sql_db_query", tool_input="SELECT COUNT(*) FROM medals;", log=""), "[(25,)]"),
+                ],
+            }
+
+    monkeypatch.setattr(helpers, "create_sql_agent", lambda llm, **kwargs: FakeAgentExecutor())
+
+    answer, sql_query = natural_language_to_sql("How many medals?", llm=None, db_name=export_db)
+
+    assert answer == "There are 25 medals."
+    assert sql_query == "SELECT COUNT(*) FROM medals;"
+
+
+def test_stream_resumes_on_another_thread(export_db):
+    cursor = open_read_only_cursor(export_db, EXPORT_QUERY)
+    stream = stream_csv(cursor, batch_size=4)
+    first_chunk = next(stream)
+
+    # StreamingResponse resumes sync generators on whichever threadpool worker is free
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        remaining_chunks = executor.submit(lambda: list(stream)).result()
+
+    rows = list(csv.reader(io.StringIO(first_chunk + "".join(remaining_chunks))))
+    assert len(rows) == EXPORT_ROWS + 1
+
+
+def test_stream_arrow_handles_mixed_type_columns(tmp_path):
+    db_path = tmp_path / "mixed.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE mixed (a, b);")
+    conn.executemany(
+        "INSERT INTO mixed (a, b) VALUES (?, ?);",
+        [(1, 1), ("one", 2), (None, 3.5), (4, "four"), (5, 6.5), (6, 7)],
+    )
+    conn.commit()
+    conn.close()
+
+    table = export_arrow(str(db_path), "SELECT a, b FROM mixed ORDER BY rowid;", batch_size=2).read_all()
+
+    assert table.schema.field("a").type == pa.string()
+    assert table.column("a").to_pylist() == ["1", "one", None, "4", "5", "6"]
+    assert table.schema.field("b").type == pa.string()
+    assert table.column("b").to_pylist() == ["1", "2", "3.5", "four", "6.5", "7"]
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+def test_stream_arrow_types_do_not_depend_on_batch_size(tmp_path, batch_size):
+    db_path = tmp_path / "numeric.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE prices (price NUMERIC, label TEXT);")
+    conn.executemany("INSERT INTO prices (price, label) VALUES (?, ?);", [(10, "a"), (20, "b"), (10.5, None)])
+    conn.commit()
+    conn.close()
+
+    table = export_arrow(str(db_path), "SELECT price, label FROM prices ORDER BY rowid;", batch_size).read_all()
+
+    assert table.schema.field("price").type == pa.float64()
+    assert table.column("price").to_pylist() == [10.0, 20.0, 10.5]
+    assert table.column("label").to_pylist() == ["a", "b", None]
+
+
+def test_open_read_only_cursor_escapes_path(export_db, tmp_path):
+    db_path = tmp_path / "user?mode=rw#%20.db"
+    shutil.copy(export_db, db_path)
+
+    cursor = open_read_only_cursor(str(db_path), EXPORT_QUERY)
+
+    assert len(cursor.fetchall()) == EXPORT_ROWS
+    cursor.connection.close()
+
+
+@pytest.mark.parametrize(
+    "sql_query, expected",
+    [
+        ("SELECT id FROM medals ORDER BY id LIMIT 10;", "SELECT id FROM medals ORDER BY id"),
+        ("SELECT id FROM medals\nlimit 10", "SELECT id FROM medals"),
+        ("SELECT id FROM medals ORDER BY id LIMIT 5;", "SELECT id FROM medals ORDER BY id LIMIT 5;"),
+        ("SELECT id FROM medals LIMIT 100;", "SELECT id FROM medals LIMIT 100;"),
+        ("SELECT * FROM (SELECT id FROM medals LIMIT 10)", "SELECT * FROM (SELECT id FROM medals LIMIT 10)"),
+    ],
+)
+def test_strip_agent_limit(sql_query, expected):
+    assert strip_agent_limit(sql_query) == expected
+
+
+def test_parse_export_batch_size():
+    assert parse_export_batch_size("250") == 250
+    for value in ["0", "-5", "lots", ""]:
+        with pytest.raises(ValueError):
+            parse_export_batch_size(value)
+
+
+def test_blobs_are_base64_encoded_in_every_format(tmp_path):
+    db_path = tmp_path / "blobs.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE files (id INTEGER, content BLOB, mixed);")
+    conn.executemany(
+        "INSERT INTO files (id, content, mixed) VALUES (?, ?, ?);",
+        [(1, b"\x00\xff", b"\x01"), (2, b"hi", "text")],
+    )
+    conn.commit()
+    conn.close()
+    sql_query = "SELECT id, content, mixed FROM files ORDER BY id;"
+
+    csv_rows = list(csv.reader(io.StringIO("".join(stream_csv(open_read_only_cursor(str(db_path), sql_query))))))
+    assert csv_rows[1:] == [["1", "AP8=", "AQ=="], ["2", "aGk=", "text"]]
+
+    records = [json.loads(line) for line in "".join(stream_ndjson(open_read_only_cursor(str(db_path), sql_query))).splitlines()]
+    assert records == [{"id": 1, "content": "AP8=", "mixed": "AQ=="}, {"id": 2, "content": "aGk=", "mixed": "text"}]
+
+    table = export_arrow(str(db_path), sql_query).read_all()
+    assert table.schema.field("content").type == pa.binary()
+    assert table.column("content").to_pylist() == [b"\x00\xff", b"hi"]
+    assert table.column("mixed").to_pylist() == ["AQ==", "text"]
+
@@ -0,0 +1,129 @@
+import csv
+import io
+import os
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from auth.database import SessionLocal
+from auth.dependencies import get_current_user
+from chatbot import routes
+from chatbot.models import Chat, Message, User
+from main import app
+from tests.conftest import EXPORT_ROWS
+
+
+@pytest.fixture
+def export_user(export_db):
+    db = SessionLocal()
+    user = User(username=f"export_{export_db}", user_database_path=export_db)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    db.close()
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def exported_message(export_user):
+    db = SessionLocal()
+    chat = Chat(user_id=export_user.id, title="export")
+    db.add(chat)
+    db.commit()
+
+    message = Message(
+        chat_id=chat.id,
+        user_id=export_user.id,
+        message="There are 25 medals.",
+        sql_query="SELECT id, country, score FROM medals ORDER BY id;",
+        database_path=export_user.user_database_path,
+    )
+    db.add(message)
+    db.commit()
+    db.refresh(message)
+    db.expunge(message)
+    db.close()
+    return message
+
+
+def test_export_message_result_streams_every_batch(exported_message, monkeypatch):
+    monkeypatch.setattr(routes, "EXPORT_BATCH_SIZE", 4)
+    client = TestClient(app)
+
+    response = client.get(f"/chatbot/export_message_result/{exported_message.id}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "country", "score"]
+    assert len(rows) == EXPORT_ROWS + 1
+    assert rows[-1] == [str(EXPORT_ROWS - 1), f"country_{EXPORT_ROWS - 1}", str((EXPORT_ROWS - 1) / 2)]
+
+
+def test_export_message_result_ignores_agent_limit(exported_message):
+    db = SessionLocal()
+    db.query(Message).filter(Message.id == exported_message.id).update(
+        {"sql_query": "SELECT id, country, score FROM medals ORDER BY id LIMIT 10;"}
+    )
+    db.commit()
+    db.close()
+    client = TestClient(app)
+
+    response = client.get(f"/chatbot/export_message_result/{exported_message.id}")
+
+    assert response.status_code == 200
+    assert len(list(csv.reader(io.StringIO(response.text)))) == EXPORT_ROWS + 1
+
+
+def test_export_message_result_arrow(exported_message, monkeypatch):
+    monkeypatch.setattr(routes, "EXPORT_BATCH_SIZE", 4)
+    client = TestClient(app)
+
+    response = client.get(
+        f"/chatbot/export_message_result/{exported_message.id}", params={"export_format": "arrow"}
+    )
+
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == EXPORT_ROWS
+    assert table.schema.field("score").type == pa.float64()
+
+
+def test_export_message_result_unknown_message(exported_message):
+    client = TestClient(app)
+
+    response = client.get("/chatbot/export_message_result/999999")
+
+    assert response.status_code == 404
+
+
+def test_export_message_result_replaced_database(exported_message, export_user, tmp_path):
+    export_user.user_database_path = str(tmp_path / "newer_upload.db")
+    client = TestClient(app)
+
+    response = client.get(f"/chatbot/export_message_result/{exported_message.id}")
+
+    assert response.status_code == 409
+
+
+def test_export_message_result_deleted_database(exported_message):
+    os.remove(exported_message.database_path)
+    client = TestClient(app)
+
+    response = client.get(f"/chatbot/export_message_result/{exported_message.id}")
+
+    assert response.status_code == 410
+
+
+def test_export_message_result_without_user_database(exported_message, export_user):
+    export_user.user_database_path = None
+    client = TestClient(app)
+
+    response = client.get(f"/chatbot/export_message_result/{exported_message.id}")
+
+    assert response.status_code == 404
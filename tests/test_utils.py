@@ -0,0 +1,18 @@
+from sqlalchemy import create_engine, inspect, text
+
+from auth.utils import add_missing_columns
+
+
+def test_add_missing_columns_is_idempotent(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE messages (id INTEGER PRIMARY KEY, message TEXT NOT NULL);"))
+        conn.execute(text("INSERT INTO messages (message) VALUES ('hello');"))
+
+    add_missing_columns(engine, {"messages": {"sql_query": "TEXT"}, "missing_table": {"a": "TEXT"}})
+    add_missing_columns(engine, {"messages": {"sql_query": "TEXT"}})
+
+    columns = [column["name"] for column in inspect(engine).get_columns("messages")]
+    assert columns == ["id", "message", "sql_query"]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT message, sql_query FROM messages;")).fetchall() == [("hello", None)]